@@ -4,27 +4,79 @@ Tests for the Mergington High School Activities API
 
 import pytest
 from fastapi.testclient import TestClient
+from pydantic import BaseModel, TypeAdapter
 from src.app import app, activities
-import copy
+from urllib.parse import quote
 
 
-@pytest.fixture
+# URL prefix for every known activity, plus the unknown names used in 404 tests
+URLS = {
+    name: f"/activities/{quote(name)}"
+    for name in [*activities, "Nonexistent Activity", "Fake Activity"]
+}
+
+
+class ActivitySchema(BaseModel):
+    """Expected shape of a single activity in the API response"""
+    description: str
+    schedule: str
+    max_participants: int
+    participants: list[str]
+
+
+# Validator for the full GET /activities response, built once per module
+ACTIVITIES_ADAPTER = TypeAdapter(dict[str, ActivitySchema])
+
+
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app"""
-    return TestClient(app)
+    """Create a test client for the FastAPI app, shared across the session"""
+    # Entering the client runs lifespan startup once and keeps one event loop
+    # portal open for every request
+    with TestClient(app) as test_client:
+        # Warm up the request path so the first test is not charged for it
+        test_client.get("/activities")
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def baseline_participants():
+    """Capture the initial participant lists once per session (or xdist worker)"""
+    return {name: tuple(activity["participants"]) for name, activity in activities.items()}
 
 
 @pytest.fixture(autouse=True)
-def reset_activities():
-    """Reset activities to initial state before each test"""
-    # Store original activities
-    original_activities = copy.deepcopy(activities)
-    
+def reset_activities(baseline_participants):
+    """Reset activities to initial state after each test"""
     yield
     
-    # Restore original activities after test
-    activities.clear()
-    activities.update(original_activities)
+    # Drop any activities added during the test
+    for name in activities.keys() - baseline_participants.keys():
+        activities.pop(name)
+    
+    # Restore participant lists in place, whatever way they were changed
+    for name, participants in baseline_participants.items():
+        activities[name]["participants"][:] = participants
+
+
+def signup(client, activity, email):
+    """Sign a student up for an activity through the API"""
+    return client.post(URLS[activity] + f"/signup?email={email}")
+
+
+def unregister(client, activity, email):
+    """Unregister a student from an activity through the API"""
+    return client.delete(URLS[activity] + f"/unregister?email={email}")
+
+
+def current_participants(activity):
+    """Return the live participant list the app reads and writes"""
+    return activities[activity]["participants"]
+
+
+def add_participant(activity, email):
+    """Sign a student up directly in memory, for arranging test state"""
+    current_participants(activity).append(email)
 
 
 class TestRootEndpoint:
@@ -56,12 +108,8 @@ class TestGetActivities:
         response = client.get("/activities")
         data = response.json()
         
-        chess_club = data["Chess Club"]
-        assert "description" in chess_club
-        assert "schedule" in chess_club
-        assert "max_participants" in chess_club
-        assert "participants" in chess_club
-        assert isinstance(chess_club["participants"], list)
+        # Raises a ValidationError if any activity has a missing or mistyped field
+        ACTIVITIES_ADAPTER.validate_python(data, strict=True)
 
 
 class TestSignupForActivity:
@@ -69,9 +117,7 @@ class TestSignupForActivity:
     
     def test_signup_for_existing_activity_success(self, client):
         """Test successful signup for an existing activity"""
-        response = client.post(
-            "/activities/Chess%20Club/signup?email=newstudent@mergington.edu"
-        )
+        response = signup(client, "Chess Club", "newstudent@mergington.edu")
         assert response.status_code == 200
         
         data = response.json()
@@ -80,42 +126,38 @@ class TestSignupForActivity:
         assert "Chess Club" in data["message"]
         
         # Verify student was added to participants
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "newstudent@mergington.edu" in activities_data["Chess Club"]["participants"]
+        assert "newstudent@mergington.edu" in current_participants("Chess Club")
     
-    def test_signup_for_nonexistent_activity(self, client):
-        """Test signup for a non-existent activity returns 404"""
-        response = client.post(
-            "/activities/Nonexistent%20Activity/signup?email=student@mergington.edu"
-        )
-        assert response.status_code == 404
-        assert "Activity not found" in response.json()["detail"]
+    @pytest.mark.parametrize("activity,email,status,detail", [
+        ("Nonexistent Activity", "student@mergington.edu", 404, "Activity not found"),
+        ("Basketball", "alex@mergington.edu", 400, "already signed up"),
+    ])
+    def test_signup_rejected(self, client, activity, email, status, detail):
+        """Test that invalid signups return the expected error"""
+        response = signup(client, activity, email)
+        assert response.status_code == status
+        assert detail in response.json()["detail"]
     
     def test_signup_duplicate_student(self, client):
         """Test that a student cannot sign up for the same activity twice"""
         email = "duplicate@mergington.edu"
         
         # First signup should succeed
-        response1 = client.post(
-            f"/activities/Basketball/signup?email={email}"
-        )
+        response1 = signup(client, "Basketball", email)
         assert response1.status_code == 200
         
         # Second signup should fail
-        response2 = client.post(
-            f"/activities/Basketball/signup?email={email}"
-        )
+        response2 = signup(client, "Basketball", email)
         assert response2.status_code == 400
         assert "already signed up" in response2.json()["detail"]
     
     def test_signup_updates_participants_list(self, client):
         """Test that signup properly updates the participants list"""
-        initial_response = client.get("/activities")
-        initial_count = len(initial_response.json()["Basketball"]["participants"])
+        initial_count = len(current_participants("Basketball"))
         
-        client.post("/activities/Basketball/signup?email=newplayer@mergington.edu")
+        signup(client, "Basketball", "newplayer@mergington.edu")
         
+        # Read the final count through the API to check the serialized state
         final_response = client.get("/activities")
         final_count = len(final_response.json()["Basketball"]["participants"])
         
@@ -128,12 +170,10 @@ class TestUnregisterFromActivity:
     def test_unregister_existing_participant_success(self, client):
         """Test successful unregistration of an existing participant"""
         # First sign up a student
-        client.post("/activities/Tennis/signup?email=temp@mergington.edu")
+        add_participant("Tennis", "temp@mergington.edu")
         
         # Then unregister them
-        response = client.delete(
-            "/activities/Tennis/unregister?email=temp@mergington.edu"
-        )
+        response = unregister(client, "Tennis", "temp@mergington.edu")
         assert response.status_code == 200
         
         data = response.json()
@@ -142,38 +182,41 @@ class TestUnregisterFromActivity:
         assert "Tennis" in data["message"]
         
         # Verify student was removed from participants
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "temp@mergington.edu" not in activities_data["Tennis"]["participants"]
+        assert "temp@mergington.edu" not in current_participants("Tennis")
     
-    def test_unregister_from_nonexistent_activity(self, client):
-        """Test unregister from a non-existent activity returns 404"""
-        response = client.delete(
-            "/activities/Fake%20Activity/unregister?email=student@mergington.edu"
-        )
-        assert response.status_code == 404
-        assert "Activity not found" in response.json()["detail"]
+    @pytest.mark.parametrize("activity,email,status,detail", [
+        ("Fake Activity", "student@mergington.edu", 404, "Activity not found"),
+        ("Chess Club", "notregistered@mergington.edu", 400, "not registered"),
+    ])
+    def test_unregister_rejected(self, client, activity, email, status, detail):
+        """Test that invalid unregistrations return the expected error"""
+        response = unregister(client, activity, email)
+        assert response.status_code == status
+        assert detail in response.json()["detail"]
     
-    def test_unregister_non_registered_student(self, client):
-        """Test unregistering a student who is not registered returns 400"""
-        response = client.delete(
-            "/activities/Chess%20Club/unregister?email=notregistered@mergington.edu"
-        )
-        assert response.status_code == 400
-        assert "not registered" in response.json()["detail"]
+    def test_unregister_twice(self, client):
+        """Test that a student cannot be unregistered twice"""
+        email = "sarah@mergington.edu"
+        
+        # First unregister should succeed
+        response1 = unregister(client, "Tennis", email)
+        assert response1.status_code == 200
+        
+        # Second unregister should fail
+        response2 = unregister(client, "Tennis", email)
+        assert response2.status_code == 400
+        assert "not registered" in response2.json()["detail"]
     
-    def test_unregister_updates_participants_list(self, client):
+    def test_unregister_updates_participants_list(self, client, baseline_participants):
         """Test that unregister properly updates the participants list"""
         # Get initial count
-        initial_response = client.get("/activities")
-        initial_participants = initial_response.json()["Chess Club"]["participants"]
-        initial_count = len(initial_participants)
+        initial_count = len(current_participants("Chess Club"))
         
         # Unregister an existing participant
-        email_to_remove = initial_participants[0]
-        client.delete(f"/activities/Chess%20Club/unregister?email={email_to_remove}")
+        email_to_remove = baseline_participants["Chess Club"][0]
+        unregister(client, "Chess Club", email_to_remove)
         
-        # Check final count
+        # Check final count through the API to verify the serialized state
         final_response = client.get("/activities")
         final_count = len(final_response.json()["Chess Club"]["participants"])
         
@@ -182,15 +225,14 @@ class TestUnregisterFromActivity:
     def test_unregister_removes_correct_student(self, client):
         """Test that unregister removes the correct student"""
         # Add two students
-        client.post("/activities/Drama%20Club/signup?email=student1@mergington.edu")
-        client.post("/activities/Drama%20Club/signup?email=student2@mergington.edu")
+        add_participant("Drama Club", "student1@mergington.edu")
+        add_participant("Drama Club", "student2@mergington.edu")
         
         # Unregister one
-        client.delete("/activities/Drama%20Club/unregister?email=student1@mergington.edu")
+        unregister(client, "Drama Club", "student1@mergington.edu")
         
         # Verify correct student was removed
-        response = client.get("/activities")
-        participants = response.json()["Drama Club"]["participants"]
+        participants = current_participants("Drama Club")
         assert "student1@mergington.edu" not in participants
         assert "student2@mergington.edu" in participants
 
@@ -203,26 +245,23 @@ class TestEndToEndWorkflows:
         email = "workflow@mergington.edu"
         activity = "Programming Class"
         
-        # Get initial state
-        initial_response = client.get("/activities")
-        initial_participants = initial_response.json()[activity]["participants"]
-        assert email not in initial_participants
+        # Check initial state
+        assert email not in current_participants(activity)
         
         # Signup
-        signup_response = client.post(f"/activities/{activity.replace(' ', '%20')}/signup?email={email}")
+        signup_response = signup(client, activity, email)
         assert signup_response.status_code == 200
         
-        # Verify signup
+        # Verify signup through the API as a contract check
         after_signup = client.get("/activities")
         assert email in after_signup.json()[activity]["participants"]
         
         # Unregister
-        unregister_response = client.delete(f"/activities/{activity.replace(' ', '%20')}/unregister?email={email}")
+        unregister_response = unregister(client, activity, email)
         assert unregister_response.status_code == 200
         
         # Verify unregister
-        after_unregister = client.get("/activities")
-        assert email not in after_unregister.json()[activity]["participants"]
+        assert email not in current_participants(activity)
     
     def test_multiple_students_same_activity(self, client):
         """Test multiple students can sign up for the same activity"""
@@ -231,11 +270,10 @@ class TestEndToEndWorkflows:
         
         # Sign up all students
         for email in emails:
-            response = client.post(f"/activities/{activity.replace(' ', '%20')}/signup?email={email}")
+            response = signup(client, activity, email)
             assert response.status_code == 200
         
         # Verify all students are registered
-        response = client.get("/activities")
-        participants = response.json()[activity]["participants"]
+        participants = current_participants(activity)
         for email in emails:
             assert email in participants